@@ -1,8 +1,11 @@
+import csv
 import os
+import re
 import sys
-from contextlib import contextmanager
+from contextlib import ExitStack, contextmanager
 from collections import defaultdict
-import pygrib
+from concurrent.futures import ProcessPoolExecutor
+import eccodes
 from tqdm import tqdm
 import datetime
 
@@ -23,84 +26,206 @@ def suppress_output():
             sys.stdout = old_stdout
             sys.stderr = old_stderr
 
-def parse_filename(filename):
-    parts = filename.split("_")
-    if len(parts) < 3:
-        return None, None, None  # Handle unexpected filename formats
+def _worker_init():
+    """Silence a catalog worker process once at startup instead of around every file."""
+    devnull = open(os.devnull, 'w')
+    sys.stdout = devnull
+    sys.stderr = devnull
+    os.environ['ECCODES_LOG'] = 'NONE'
 
-    variable_name = parts[0]
-    variable_set = parts[1]
-    forecast_hour = parts[2].replace("f", "").replace(".grib2", "")  # Remove the 'f' prefix and '.grib2'
+# {variable}_{set}_f{HH}.grib2, e.g. jfwprb_qmd_f012.grib2
+FILENAME_PATTERN = re.compile(r'^([^_]+)_([^_]+)_f(\d+)\.grib2$')
 
-    # Ensure forecast_hour is numeric
-    if not forecast_hour.isdigit():
-        return None, None, None
+def parse_filename(filename):
+    match = FILENAME_PATTERN.match(filename)
+    if match is None:
+        return None, None, None  # Handle unexpected filename formats
 
+    variable_name, variable_set, forecast_hour = match.groups()
     return variable_name, variable_set, forecast_hour
 
 def list_files_recursively(directory, start_date=None, end_date=None):
+    # Layout is {directory}/{YYYYMMDD}/{HH}/{files}; only descend into date folders
+    # inside the requested range instead of walking the whole archive.
     results = []
-    for root, dirs, files in os.walk(directory):
-        path_parts = root.split(os.sep)
-        if len(path_parts) < 3:
-            continue  # Skip directories that don't have enough levels
-
-        init_date = path_parts[-2]  # Subdir level 1
-        init_time = path_parts[-1]  # Subdir level 2
-
-        # Filter by start_date and end_date if provided
-        if start_date and init_date < start_date:
-            continue
-        if end_date and init_date > end_date:
-            continue
-
-        for file in files:
-            variable_name, variable_set, forecast_hour = parse_filename(file)
-            if variable_name and variable_set and forecast_hour:
-                file_path = os.path.join(root, file)
-                results.append((init_date, init_time, forecast_hour, variable_set, variable_name, file_path))
+    with os.scandir(directory) as date_entries:
+        for date_entry in date_entries:
+            init_date = date_entry.name
+            if not (date_entry.is_dir() and init_date.isdigit()):
+                continue
+
+            # Filter by start_date and end_date if provided
+            if start_date and init_date < start_date:
+                continue
+            if end_date and init_date > end_date:
+                continue
+
+            with os.scandir(date_entry.path) as init_entries:
+                for init_entry in init_entries:
+                    if not init_entry.is_dir():
+                        continue
+                    init_time = init_entry.name
+
+                    with os.scandir(init_entry.path) as file_entries:
+                        for file_entry in file_entries:
+                            variable_name, variable_set, forecast_hour = parse_filename(file_entry.name)
+                            if variable_name and variable_set and forecast_hour:
+                                results.append((init_date, init_time, forecast_hour, variable_set, variable_name, file_entry.path))
 
     # Sort results by init_date, init_time, and forecast_hour
-    results.sort(key=lambda x: (x[0], x[1], int(x[2])))
+    # forecast_hour stays the zero-padded string from the file name; only the sort key is numeric
+    results.sort(key=lambda r: (r[0], r[1], int(r[2])))
 
     return results
 
+# (output column, ecCodes key, numeric) for every field the catalog records
+METADATA_KEYS = [
+    ("parameterName", "parameterName", False),
+    ("parameterUnits", "parameterUnits", False),
+    ("lengthOfTimeRange", "lengthOfTimeRange", True),
+    ("min", "minimum", True),
+    ("max", "maximum", True),
+    ("avg", "average", True),
+    ("probabilityTypeName", "probabilityTypeName", False),
+    ("lowerLimit", "lowerLimit", True),
+    ("upperLimit", "upperLimit", True),
+    ("percentileValue", "percentileValue", True),
+]
+
+# pygrib's forecast time unit labels, keyed by stepUnits
+FCST_TIME_UNITS = {
+    0: 'mins', 1: 'hrs', 2: 'days', 3: 'months', 4: 'years', 5: 'decades',
+    6: '30 yr periods', 7: 'centuries', 10: '3 hrs', 11: '6 hrs', 12: '12 hrs', 13: 'secs',
+}
+
+# pygrib's labels for derived (ensemble statistic) forecasts, keyed by derivedForecast
+DERIVED_FORECAST_NAMES = {
+    0: 'ens mean', 1: 'weighted ens mean', 2: 'ens std dev', 3: 'normalized ens std dev',
+    4: 'ens spread', 5: 'ens large anomaly index', 6: 'ens mean of cluster',
+}
+
 def extract_grib_metadata(file_path):
     metadata = []
 
-    def safe_get(msg, key, default="N/A", is_numeric=False):
+    def safe_get(gid, key, default="N/A", is_numeric=False):
         try:
-            value = msg[key]
+            value = eccodes.codes_get(gid, key)
             if is_numeric and isinstance(value, (int, float)):
                 if value == 255.00:  # Replace error value with 'N/A'
                     return default
                 return f"{value:.2f}"
             elif not is_numeric:
                 return str(value)
-        except KeyError:
+        except eccodes.CodesInternalError:
             return default
         except Exception:
             return default
         return default
 
+    def describe(gid, count):
+        # Rebuilds pygrib's str(msg) inventory line (gribmessage.__repr__) from the
+        # same header keys, so catalogs stay comparable with ones written through pygrib
+        def key(name):
+            try:
+                if eccodes.codes_is_defined(gid, name) and not eccodes.codes_is_missing(gid, name):
+                    return eccodes.codes_get(gid, name)
+            except Exception:
+                pass
+            return None
+
+        def scaled(value_key, factor_key):
+            value, factor = key(value_key), key(factor_key)
+            if value is None or factor is None:
+                return None
+            return value / 10.0 ** factor if factor else value
+
+        inventory = []
+        name, units = key('name'), key('units')
+        if name is not None:
+            if name != 'unknown':
+                inventory.append(f"{count}:{name}")
+            elif key('parameterName') is not None:
+                inventory.append(f"{count}:{key('parameterName')}")
+        if units is not None:
+            if units != 'unknown':
+                inventory.append(f":{units}")
+            elif key('parameterUnits') is not None:
+                inventory.append(f":{key('parameterUnits')}")
+        step_type = key('stepType')
+        if step_type is not None:
+            inventory.append(f" ({step_type})")
+        grid_type = key('typeOfGrid') or key('gridType')
+        if grid_type is not None:
+            inventory.append(f":{grid_type}")
+        if key('typeOfLevel') is not None:
+            inventory.append(f":{key('typeOfLevel')}")
+        if key('topLevel') is not None and key('bottomLevel') is not None:
+            top = bottom = None
+            if key('typeOfFirstFixedSurface') not in (None, 255):
+                top = scaled('scaledValueOfFirstFixedSurface', 'scaleFactorOfFirstFixedSurface')
+                if top is None:
+                    top = key('topLevel')
+            if key('typeOfSecondFixedSurface') not in (None, 255):
+                bottom = scaled('scaledValueOfSecondFixedSurface', 'scaleFactorOfSecondFixedSurface')
+                if bottom is None:
+                    bottom = key('bottomLevel')
+            level = f":level {top}" if bottom is None or top == bottom else f":levels {top}-{bottom}"
+            level_units = key('unitsOfFirstFixedSurface')
+            if level_units not in (None, 'unknown'):
+                level += f" {level_units}"
+            inventory.append(level)
+        elif key('level') is not None:
+            inventory.append(f":level {key('level')}")
+        time_units = FCST_TIME_UNITS.get(key('stepUnits'), '')
+        if key('stepRange') is not None:
+            inventory.append(f":fcst time {key('stepRange')} {time_units}")
+            if step_type not in (None, 'instant'):
+                inventory.append(f" ({step_type})")
+        elif key('forecastTime') is not None:
+            inventory.append(f":fcst time {key('forecastTime')} {time_units}")
+        if key('dataDate') is not None and key('dataTime') is not None:
+            inventory.append(f":from {key('dataDate')}{key('dataTime'):04d}")
+        ens_type, pert = key('typeOfEnsembleForecast'), key('perturbationNumber')
+        if ens_type is not None and pert is not None:
+            if ens_type in (0, 1):
+                inventory.append(f":{'lo' if ens_type == 0 else 'hi'} res cntl fcst")
+            elif ens_type in (2, 3):
+                inventory.append(f":{'neg' if ens_type == 2 else 'pos'} ens pert {pert}")
+        if key('derivedForecast') in DERIVED_FORECAST_NAMES:
+            inventory.append(f":{DERIVED_FORECAST_NAMES[key('derivedForecast')]}")
+        if key('probabilityTypeName') is not None:
+            # The limits that tell JFWPRB threshold messages apart; pygrib skips a
+            # limit whose scaled value or scale factor is zero
+            inventory.append(f":{key('probabilityTypeName')}")
+            lower = key('scaledValueOfLowerLimit') and key('scaleFactorOfLowerLimit') and \
+                scaled('scaledValueOfLowerLimit', 'scaleFactorOfLowerLimit')
+            upper = key('scaledValueOfUpperLimit') and key('scaleFactorOfUpperLimit') and \
+                scaled('scaledValueOfUpperLimit', 'scaleFactorOfUpperLimit')
+            if upper and lower:
+                inventory.append(f" ({upper}-{lower})")
+            elif upper:
+                inventory.append(f" (> {upper})")
+            elif lower:
+                inventory.append(f" (< {lower})")
+        return ''.join(inventory)
+
     try:
-        with suppress_output():
-            with pygrib.open(file_path) as grb:
-                for msg in grb:
-                    entry = {
-                        "message": str(msg),
-                        "parameterName": safe_get(msg, 'parameterName'),
-                        "parameterUnits": safe_get(msg, 'parameterUnits'),
-                        "lengthOfTimeRange": safe_get(msg, 'lengthOfTimeRange', is_numeric=True),
-                        "min": safe_get(msg, 'minimum', is_numeric=True),
-                        "max": safe_get(msg, 'maximum', is_numeric=True),
-                        "avg": safe_get(msg, 'average', is_numeric=True),
-                        "probabilityTypeName": safe_get(msg, 'probabilityTypeName'),
-                        "lowerLimit": safe_get(msg, 'lowerLimit', is_numeric=True),
-                        "upperLimit": safe_get(msg, 'upperLimit', is_numeric=True),
-                        "percentileValue": safe_get(msg, 'percentileValue', is_numeric=True)
-                    }
-                    metadata.append(entry)
+        # Raw ecCodes handles only touch the header keys requested below, unlike pygrib
+        # which wraps every message in a Python object before any key is read.
+        with open(file_path, 'rb') as f:
+            count = 0
+            while True:
+                gid = eccodes.codes_grib_new_from_file(f)
+                if gid is None:
+                    break
+                count += 1
+                try:
+                    entry = {"message": describe(gid, count)}
+                    for column, key, is_numeric in METADATA_KEYS:
+                        entry[column] = safe_get(gid, key, is_numeric=is_numeric)
+                finally:
+                    eccodes.codes_release(gid)
+                metadata.append(entry)
     except Exception as e:
         metadata.append({
             "message": f"Error reading GRIB file {file_path}",
@@ -118,15 +243,41 @@ def extract_grib_metadata(file_path):
 
     return metadata
 
-def save_results_to_file(results, output_file):
-    with open(output_file, "w") as f:
-        # Write header row
-        f.write("init_date,init_time,forecast_hour,variable_set,variable_name,grib_message,parameterName,parameterUnits,lengthOfTimeRange,min,max,avg,probabilityTypeName,lowerLimit,upperLimit,percentileValue\n")
-        for result in tqdm(results, desc="Processing files"):
+def _extract_grib_metadata_quiet(file_path):
+    # Single-process path: there is no worker initializer, so silence each file
+    with suppress_output():
+        return extract_grib_metadata(file_path)
+
+CSV_HEADER = [
+    "init_date", "init_time", "forecast_hour", "variable_set", "variable_name",
+    "grib_message", "parameterName", "parameterUnits", "lengthOfTimeRange",
+    "min", "max", "avg", "probabilityTypeName", "lowerLimit", "upperLimit", "percentileValue"
+]
+WRITE_BATCH_SIZE = 1000
+
+def save_results_to_file(results, output_file, max_workers=None):
+    # Each GRIB file is decoded independently, so fan the metadata extraction out over
+    # worker processes; executor.map yields in submission order so rows stay sorted.
+    # max_workers=1 runs in-process instead.
+    file_paths = [result[5] for result in results]
+
+    # newline='' lets csv.writer control line endings; the 1 MiB buffer keeps write syscalls rare
+    with open(output_file, "w", newline="", buffering=1 << 20) as f, ExitStack() as stack:
+        if max_workers == 1:
+            metadata_iter = map(_extract_grib_metadata_quiet, file_paths)
+        else:
+            executor = stack.enter_context(ProcessPoolExecutor(
+                max_workers=max_workers or os.cpu_count(), initializer=_worker_init
+            ))
+            metadata_iter = executor.map(extract_grib_metadata, file_paths, chunksize=8)
+
+        writer = csv.writer(f, quoting=csv.QUOTE_MINIMAL)
+        writer.writerow(CSV_HEADER)
+        batch = []
+        for result, grib_metadata in tqdm(zip(results, metadata_iter), total=len(results), desc="Processing files"):
             init_date, init_time, forecast_hour, variable_set, variable_name, file_path = result
-            grib_metadata = extract_grib_metadata(file_path)
             for meta in grib_metadata:
-                f.write(",".join([
+                batch.append((
                     init_date,
                     init_time,
                     forecast_hour,
@@ -143,7 +294,12 @@ def save_results_to_file(results, output_file):
                     meta["lowerLimit"],
                     meta["upperLimit"],
                     meta["percentileValue"]
-                ]) + "\n")
+                ))
+            if len(batch) >= WRITE_BATCH_SIZE:
+                writer.writerows(batch)
+                batch.clear()
+        if batch:
+            writer.writerows(batch)
 
 if __name__ == "__main__":
     # Prompt user for start and end dates interactively
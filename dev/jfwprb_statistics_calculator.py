@@ -4,24 +4,33 @@ JFWPRB Fire Weather Probability Statistics Calculator
 This script processes all JFWPRB GRIB2 files across all dates and initialization times,
 calculating MAX, MIN, MEDIAN, and AVERAGE statistics for each variable.
 
-Output: CSV file with statistics for each variable from each file for each timestamp.
+Output: Parquet file with statistics for each variable from each file for each timestamp,
+        plus CSV summaries by variable and by date/init.
 
 Structure: N:/data/nbm_para/{date}/{init_hour}/jfwprb_qmd_f{forecast_hour}.grib2
 """
 
 import os
 import sys
-import dask
-import dask.array as da
-from dask.distributed import Client, LocalCluster
+import hashlib
+import json
+import re
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from numba import njit, prange, set_num_threads
+from tqdm import tqdm
 from pathlib import Path
-import pygrib
+import eccodes
 from datetime import datetime
 import argparse
 import logging
-from concurrent.futures import ThreadPoolExecutor
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from itertools import islice
+from collections import deque
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -53,19 +62,124 @@ VARIABLE_NAMES = [
 # File prefix to search for
 FILE_PREFIX = 'jfwprb'
 
+# Forecast hour suffix of a GRIB file name, e.g. jfwprb_qmd_f012.grib2 -> 012
+FORECAST_HOUR_PATTERN = re.compile(r'_f(\d+)\.gri?b2?$')
+
+# Number of upcoming files read ahead on background threads while one decodes
+PREFETCH_DEPTH = 4
+
+# Bump whenever decoding or the statistics change, so stale cache entries miss
+STATS_CACHE_VERSION = 2
+
+# Files whose records are buffered before a Parquet write in sequential mode
+WRITE_EVERY_FILES = 100
+
 # Output directory
 OUTPUT_DIR = Path(r'c:/Users/michael.wessler/Code/nbm-v5-verification/output')
 
+# Schema of the per-variable result records streamed to Parquet
+RESULT_SCHEMA = pa.schema([
+    ('date', pa.string()),
+    ('init_hour', pa.string()),
+    ('forecast_hour', pa.int16()),
+    ('variable', pa.string()),
+    ('file_name', pa.string()),
+    ('max', pa.float32()),
+    ('min', pa.float32()),
+    ('median', pa.float32()),
+    ('mean', pa.float32()),
+    ('std', pa.float32()),
+    ('nonzero_count', pa.int64()),
+    ('total_cells', pa.int64()),
+    ('data_date', pa.int64()),
+    ('data_time', pa.int64()),
+])
+
 # ==============================================================================
 # STATISTICS FUNCTIONS
 # ==============================================================================
 
-def calculate_variable_statistics(data: np.ndarray) -> dict:
+# fastmath without 'nnan': the kernel relies on isnan() to skip missing cells, so LLVM
+# must not assume NaN-free input. Reassociation is enough to vectorize the reductions.
+# The explicit signature compiles eagerly at import and cache=True persists the machine
+# code to __pycache__, so every worker process loads it instead of re-JIT-ing.
+@njit('Tuple((f8, f8, f8, f8, f8, i8, i8))(f4[::1])',
+      cache=True, fastmath={'reassoc', 'contract', 'nsz'}, parallel=True)
+def _stats_kernel(a):
+    """
+    Single-pass NaN-skipping reduction over a flat array.
+    
+    Moments are accumulated about a shift (the first valid value) rather than
+    zero, so var = E[(x-K)^2] - E[x-K]^2 does not cancel catastrophically when
+    the spread is small relative to the magnitude of the field.
+    
+    Returns:
+        Tuple of (max, min, shift, shifted sum, shifted sum of squares,
+        nonzero count, valid count)
+    """
+    k = 0.0
+    for i in range(a.size):
+        if not np.isnan(a[i]):
+            k = a[i]
+            break
+    
+    mx = -np.inf
+    mn = np.inf
+    s = 0.0
+    s2 = 0.0
+    nz = 0
+    n = 0
+    for i in prange(a.size):
+        v = a[i]
+        if not np.isnan(v):
+            mx = max(mx, v)
+            mn = min(mn, v)
+            d = v - k
+            s += d
+            s2 += d * d
+            if v > 0:
+                nz += 1
+            n += 1
+    return mx, mn, k, s, s2, nz, n
+
+
+@njit('Tuple((f8, f8, f8, f8, f8, i8, i8))(f4[::1])',
+      cache=True, fastmath={'reassoc', 'contract', 'nsz'}, parallel=True)
+def _stats_kernel_finite(a):
+    """
+    _stats_kernel for arrays known to contain no NaNs.
+    
+    Without the per-element NaN branch the loop body is straight-line and
+    vectorizes; the caller is responsible for the input being NaN-free.
+    """
+    k = a[0] if a.size else 0.0
+    mx = -np.inf
+    mn = np.inf
+    s = 0.0
+    s2 = 0.0
+    nz = 0
+    for i in prange(a.size):
+        v = a[i]
+        mx = max(mx, v)
+        mn = min(mn, v)
+        d = v - k
+        s += d
+        s2 += d * d
+        if v > 0:
+            nz += 1
+    return mx, mn, k, s, s2, nz, a.size
+
+
+def calculate_variable_statistics(data: np.ndarray, assume_finite: bool = False) -> dict:
     """
     Calculate MAX, MIN, MEDIAN, and AVERAGE statistics for a 2D array.
     
     Args:
-        data: 2D numpy array of values
+        data: 2D numpy array of values (float32 preferred; other dtypes are
+              converted before reduction)
+        assume_finite: Caller guarantees the array holds no NaNs (e.g. a GRIB
+                       message with no missing-value sentinels), enabling the reduction
+                       kernel without the per-element NaN check
         
     Returns:
         Dictionary with max, min, median, mean statistics
@@ -74,11 +188,11 @@ def calculate_variable_statistics(data: np.ndarray) -> dict:
     if isinstance(data, np.ma.MaskedArray):
         data = data.filled(np.nan)
     
-    # Flatten and remove NaN values for statistics
-    flat_data = data.flatten()
-    valid_data = flat_data[~np.isnan(flat_data)]
+    flat_data = np.ascontiguousarray(data, dtype=np.float32).ravel()
+    kernel = _stats_kernel_finite if assume_finite else _stats_kernel
+    mx, mn, shift, shifted_sum, shifted_sq, nonzero_count, n = kernel(flat_data)
     
-    if len(valid_data) == 0:
+    if n == 0:
         return {
             'max': np.nan,
             'min': np.nan,
@@ -89,61 +203,180 @@ def calculate_variable_statistics(data: np.ndarray) -> dict:
             'total_cells': len(flat_data)
         }
     
+    shifted_mean = shifted_sum / n
+    mean = shift + shifted_mean
+    # O(N) selection instead of np.median's full sort; for even counts the
+    # lower middle element is the max of the left partition. np.partition orders
+    # NaNs last, so with k < n (the kernel's valid count) selecting on the raw
+    # array gives the valid-cell median without building a mask or gathered copy.
+    k = n // 2
+    part = np.partition(flat_data, k)
+    median = part[k] if n % 2 else 0.5 * (float(part[k]) + float(part[:k].max()))
+    
     return {
-        'max': float(np.max(valid_data)),
-        'min': float(np.min(valid_data)),
-        'median': float(np.median(valid_data)),
-        'mean': float(np.mean(valid_data)),
-        'std': float(np.std(valid_data)),
-        'nonzero_count': int(np.sum(valid_data > 0)),
-        'total_cells': int(len(valid_data))
+        'max': float(mx),
+        'min': float(mn),
+        'median': float(median),
+        'mean': float(mean),
+        'std': float(np.sqrt(max(shifted_sq / n - shifted_mean * shifted_mean, 0.0))),
+        'nonzero_count': int(nonzero_count),
+        'total_cells': int(n)
     }
 
 
-def process_single_grib_file(file_path: Path, variable_names: list) -> list:
+def _split_messages(raw: bytes):
+    """
+    Yield each GRIB message contained in an in-memory file.
+    
+    Message lengths come from Section 0 (bytes 8-15 for GRIB2, 4-6 for GRIB1).
+    """
+    offset = raw.find(b'GRIB')
+    while offset != -1 and offset + 16 <= len(raw):
+        if raw[offset + 7] == 2:
+            length = int.from_bytes(raw[offset + 8:offset + 16], 'big')
+        else:
+            length = int.from_bytes(raw[offset + 4:offset + 7], 'big')
+        yield raw[offset:offset + length]
+        offset = raw.find(b'GRIB', offset + length)
+
+
+def _iter_messages(file_path: Path, raw: bytes = None):
+    """
+    Yield the decoded grid and reference date/time for each GRIB message.
+    
+    The file is pulled in with one sequential read (a single burst of round-trips
+    on the SMB-mounted archive) and messages are decoded from memory. Values come
+    straight from ecCodes handles, skipping pygrib's per-message wrapper and the
+    masked array it builds even when no bitmap is present.
+    
+    Args:
+        file_path: Path to the GRIB file
+        raw: Optional file contents already read (e.g. by a prefetcher)
+        
+    Yields:
+        Tuple of (2D float32 values with NaN for missing points, whether any
+        point was missing (i.e. the grid contains NaNs), dataDate, dataTime)
+    """
+    if raw is None:
+        raw = Path(file_path).read_bytes()
+    for message in _split_messages(raw):
+        gid = eccodes.codes_new_from_message(message)
+        try:
+            # Decode straight to single precision; skips the float64 array and the
+            # downcast copy, and the missing-value sweep touches half the bytes
+            values = eccodes.codes_get_float_array(gid, 'values')
+            # Complex packing (templates 5.2/5.3) can carry missing values without a
+            # bitmap, so compare against the sentinel regardless, as pygrib's masking did
+            missing = values == np.float32(eccodes.codes_get(gid, 'missingValue'))
+            has_missing = bool(missing.any())
+            if has_missing:
+                values[missing] = np.nan
+            values = values.reshape(eccodes.codes_get(gid, 'Nj'), eccodes.codes_get(gid, 'Ni'))
+            yield values, has_missing, eccodes.codes_get(gid, 'dataDate'), eccodes.codes_get(gid, 'dataTime')
+        finally:
+            eccodes.codes_release(gid)
+
+
+def extract_forecast_hour(file_name: str):
+    """
+    Parse the forecast hour from a GRIB file name.
+    
+    Returns:
+        Forecast hour as int, or None if the name does not match
+    """
+    match = FORECAST_HOUR_PATTERN.search(file_name)
+    return int(match.group(1)) if match else None
+
+
+def _stats_cache_entry(file_path: Path, variable_names: list, cache_dir: Path) -> tuple:
+    """
+    Locate the cache file for a GRIB and the key its contents must match.
+    
+    Archived GRIBs are immutable, so (mtime, size) identifies a file's contents;
+    the variable list is part of the key because it determines the records, and
+    STATS_CACHE_VERSION because the code that computed them does too.
+    """
+    st = os.stat(file_path)
+    key = f"v{STATS_CACHE_VERSION}:{st.st_mtime_ns:x}:{st.st_size}:{'|'.join(variable_names)}"
+    name = hashlib.sha1(os.path.abspath(file_path).encode()).hexdigest()
+    return Path(cache_dir) / f'{name}.json', key
+
+
+def _load_cached_stats(file_path: Path, variable_names: list, cache_dir: Path):
+    """
+    Return the cached result records for an unchanged file, or None on a miss.
+    """
+    try:
+        cache_path, key = _stats_cache_entry(file_path, variable_names, cache_dir)
+        with open(cache_path) as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return entry['rows'] if entry.get('key') == key else None
+
+
+def _store_cached_stats(file_path: Path, variable_names: list, cache_dir: Path, rows: list):
+    """
+    Write result records to the cache (atomic replace, safe across workers).
+    """
+    try:
+        cache_path, key = _stats_cache_entry(file_path, variable_names, cache_dir)
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(f'.{os.getpid()}.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump({'path': str(file_path), 'key': key, 'rows': rows}, f)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logger.warning(f"Could not cache statistics for {file_path}: {e}")
+
+
+def process_single_grib_file(file_path: Path, variable_names: list, raw: bytes = None,
+                             cache_dir: Path = None) -> list:
     """
     Process a single GRIB file and extract statistics for each variable.
     
     Args:
         file_path: Path to the GRIB file
-        variable_names: List of variable names corresponding to GRIB messages
+        variable_names: List of variable names corresponding, in order, to the
+                        first len(variable_names) GRIB messages
+        raw: Optional file contents already read (e.g. by a prefetcher, which
+             has already checked the cache)
+        cache_dir: Optional stats cache directory; unchanged files are served
+                   from it and fresh results are written back once every
+                   variable has been computed
         
     Returns:
         List of dictionaries containing statistics for each variable
     """
+    if cache_dir is not None and raw is None:
+        cached = _load_cached_stats(file_path, variable_names, cache_dir)
+        if cached is not None:
+            return cached
+    
     results = []
     
     try:
         # Extract metadata from filename
         # Format: jfwprb_qmd_f{forecast_hour}.grib2
-        fname = file_path.stem
-        try:
-            forecast_hour = int(fname.split('_f')[-1])
-        except (ValueError, IndexError):
+        forecast_hour = extract_forecast_hour(file_path.name)
+        if forecast_hour is None:
             forecast_hour = 0
-            logger.warning(f"Could not extract forecast hour from {fname}")
+            logger.warning(f"Could not extract forecast hour from {file_path.name}")
         
         # Extract date and init hour from path
         # Structure: .../date/init_hour/filename
         init_hour = file_path.parent.name
         date_str = file_path.parent.parent.name
         
-        # Open GRIB file
-        grbs = pygrib.open(str(file_path))
-        
-        # Process each message (variable)
-        for msg_idx, grb in enumerate(grbs):
-            if msg_idx >= len(variable_names):
-                break
-            
-            var_name = variable_names[msg_idx]
+        # Process each message (variable). Messages map 1:1, in order, onto
+        # variable_names; islice stops before a handle is even created for any
+        # trailing message, rather than decoding it and then breaking.
+        messages = islice(_iter_messages(file_path, raw), len(variable_names))
+        for var_name, (data, has_missing, data_date, data_time) in zip(variable_names, messages):
             
             try:
-                # Get data values
-                data = grb.values
-                
-                # Calculate statistics
-                stats = calculate_variable_statistics(data)
+                # Calculate statistics; with no missing points every decoded value is valid
+                stats = calculate_variable_statistics(data, assume_finite=not has_missing)
                 
                 # Build result record
                 result = {
@@ -158,38 +391,93 @@ def process_single_grib_file(file_path: Path, variable_names: list) -> list:
                     'mean': stats['mean'],
                     'std': stats['std'],
                     'nonzero_count': stats['nonzero_count'],
-                    'total_cells': stats['total_cells']
+                    'total_cells': stats['total_cells'],
+                    'data_date': data_date,
+                    'data_time': data_time
                 }
                 
-                # Add valid time calculation (if data_date available)
-                try:
-                    data_date = grb['dataDate']
-                    data_time = grb['dataTime']
-                    result['data_date'] = data_date
-                    result['data_time'] = data_time
-                except:
-                    pass
-                
                 results.append(result)
                 
             except Exception as e:
                 logger.error(f"Error processing variable {var_name} in {file_path}: {e}")
                 continue
         
-        grbs.close()
-        
     except Exception as e:
         logger.error(f"Error opening GRIB file {file_path}: {e}")
     
+    # Only a complete file is cached, so a failure is retried (and logged) next run
+    if cache_dir is not None and len(results) == len(variable_names):
+        _store_cached_stats(file_path, variable_names, cache_dir, results)
+    
     return results
 
 
-@dask.delayed
-def process_grib_file_delayed(file_path: Path, variable_names: list) -> list:
+def _read_ahead(file_path: Path, variable_names: list, cache_dir: Path = None) -> tuple:
+    """
+    Prefetch task: return (cached records, None) on a cache hit, else (None, file bytes).
+    """
+    if cache_dir is not None:
+        cached = _load_cached_stats(file_path, variable_names, cache_dir)
+        if cached is not None:
+            return cached, None
+    return None, Path(file_path).read_bytes()
+
+
+def iter_file_results(file_paths: list, variable_names: list, cache_dir: Path = None,
+                      prefetch: int = PREFETCH_DEPTH):
+    """
+    Process files in order while the next few are read on background threads.
+    
+    On network storage the read dominates, so overlapping it with decode makes
+    the total time roughly max(IO, decode) instead of their sum. Files with a
+    valid stats cache entry are never read at all.
+    
+    Args:
+        file_paths: GRIB file paths, in processing order
+        variable_names: List of variable names
+        cache_dir: Optional stats cache directory
+        prefetch: Number of files to keep in flight ahead of the current one
+        
+    Yields:
+        Tuple of (file_path, list of result dicts) for each file
+    """
+    paths = iter(file_paths)
+    read_ahead = partial(_read_ahead, variable_names=variable_names, cache_dir=cache_dir)
+    
+    with ThreadPoolExecutor(max_workers=2) as reader:
+        pending = deque(
+            (path, reader.submit(read_ahead, path)) for path in islice(paths, prefetch)
+        )
+        while pending:
+            file_path, future = pending.popleft()
+            next_path = next(paths, None)
+            if next_path is not None:
+                pending.append((next_path, reader.submit(read_ahead, next_path)))
+            
+            try:
+                cached, raw = future.result()
+            except OSError:
+                cached, raw = None, None  # process_single_grib_file re-reads and logs the error
+            
+            if cached is not None:
+                yield file_path, cached
+            else:
+                yield file_path, process_single_grib_file(file_path, variable_names, raw, cache_dir)
+
+
+def _pool_worker_init():
     """
-    Dask-delayed wrapper for processing a single GRIB file.
+    Pool initializer: run the parallel=True kernels single-threaded in each worker,
+    since the pool already spreads files across cores.
     """
-    return process_single_grib_file(file_path, variable_names)
+    set_num_threads(1)
+
+
+def _process_file_batch(file_paths: list, variable_names: list, cache_dir: Path = None) -> list:
+    """
+    Pool task: process a batch of files with read-ahead, one result list per file.
+    """
+    return [results for _, results in iter_file_results(file_paths, variable_names, cache_dir)]
 
 
 # ==============================================================================
@@ -206,17 +494,18 @@ def discover_date_folders(data_dir: Path) -> list:
     Returns:
         List of date folder paths, sorted
     """
-    date_folders = []
-    
     if not data_dir.exists():
         logger.error(f"Data directory not found: {data_dir}")
-        return date_folders
+        return []
     
-    for item in data_dir.iterdir():
-        if item.is_dir():
-            # Check if folder name looks like a date (8 digits: YYYYMMDD)
-            if item.name.isdigit() and len(item.name) == 8:
-                date_folders.append(item)
+    # os.scandir yields DirEntry objects with cached type info, so only the
+    # matching folders are ever promoted to Path objects
+    with os.scandir(data_dir) as it:
+        # Check if folder name looks like a date (8 digits: YYYYMMDD)
+        date_folders = [
+            Path(e.path) for e in it
+            if e.is_dir() and e.name.isdigit() and len(e.name) == 8
+        ]
     
     return sorted(date_folders)
 
@@ -231,13 +520,12 @@ def discover_init_hour_folders(date_folder: Path) -> list:
     Returns:
         List of init hour folder paths, sorted
     """
-    init_folders = []
-    
-    for item in date_folder.iterdir():
-        if item.is_dir():
-            # Check if folder name is a valid init hour (00, 06, 12, 18, etc.)
-            if item.name.isdigit() and len(item.name) == 2:
-                init_folders.append(item)
+    with os.scandir(date_folder) as it:
+        # Check if folder name is a valid init hour (00, 06, 12, 18, etc.)
+        init_folders = [
+            Path(e.path) for e in it
+            if e.is_dir() and e.name.isdigit() and len(e.name) == 2
+        ]
     
     return sorted(init_folders)
 
@@ -253,26 +541,22 @@ def discover_grib_files(init_folder: Path, file_prefix: str = FILE_PREFIX) -> li
     Returns:
         List of GRIB file paths, sorted by forecast hour
     """
-    grib_files = []
-    
-    for item in init_folder.iterdir():
-        if item.is_file() and item.name.startswith(file_prefix):
-            if item.suffix in ['.grib2', '.grb2', '.grib', '.grb']:
-                grib_files.append(item)
+    with os.scandir(init_folder) as it:
+        grib_files = [
+            Path(e.path) for e in it
+            if e.name.startswith(file_prefix)
+            and os.path.splitext(e.name)[1] in ('.grib2', '.grb2', '.grib', '.grb')
+            and e.is_file()
+        ]
     
     # Sort by forecast hour
-    def extract_forecast_hour(f):
-        try:
-            return int(f.stem.split('_f')[-1])
-        except:
-            return 0
-    
-    return sorted(grib_files, key=extract_forecast_hour)
+    return sorted(grib_files, key=lambda f: extract_forecast_hour(f.name) or 0)
 
 
 def discover_all_files(data_dir: Path, 
                        date_filter: str = None, 
-                       init_filter: str = None) -> dict:
+                       init_filter: str = None,
+                       show_size: bool = False) -> dict:
     """
     Discover all GRIB files across all dates and init times.
     
@@ -280,6 +564,8 @@ def discover_all_files(data_dir: Path,
         data_dir: Base data directory
         date_filter: Optional specific date to process (YYYYMMDD)
         init_filter: Optional specific init hour to process (00, 06, 12, 18)
+        show_size: Also stat every file to report total data size (also enabled
+                   when DEBUG logging is on)
         
     Returns:
         Dictionary with structure: {date: {init_hour: [file_paths]}}
@@ -287,6 +573,8 @@ def discover_all_files(data_dir: Path,
     all_files = {}
     total_files = 0
     total_size = 0
+    # Sizing every file costs one stat() per GRIB, so only pay for it when asked
+    show_size = show_size or logger.isEnabledFor(logging.DEBUG)
     
     date_folders = discover_date_folders(data_dir)
     
@@ -313,10 +601,12 @@ def discover_all_files(data_dir: Path,
             if grib_files:
                 all_files[date_str][init_hour] = grib_files
                 total_files += len(grib_files)
-                total_size += sum(f.stat().st_size for f in grib_files)
+                if show_size:
+                    total_size += sum(os.stat(f).st_size for f in grib_files)
     
     logger.info(f"Total files discovered: {total_files}")
-    logger.info(f"Total data size: {total_size / 1024**3:.2f} GB")
+    if show_size:
+        logger.info(f"Total data size: {total_size / 1024**3:.2f} GB")
     
     return all_files
 
@@ -325,61 +615,98 @@ def discover_all_files(data_dir: Path,
 # MAIN PROCESSING FUNCTIONS
 # ==============================================================================
 
+def _write_records(writer: pq.ParquetWriter, records: list) -> int:
+    """
+    Append a list of result dicts to the Parquet stream as one record batch.
+    
+    Returns:
+        Number of records written
+    """
+    if records:
+        writer.write_batch(pa.RecordBatch.from_pylist(records, schema=RESULT_SCHEMA))
+    return len(records)
+
+
 def process_all_files_sequential(all_files: dict, 
                                   variable_names: list,
-                                  progress_callback=None) -> pd.DataFrame:
+                                  writer: pq.ParquetWriter,
+                                  progress_callback=None,
+                                  cache_dir: Path = None) -> int:
     """
     Process all GRIB files sequentially (lower memory usage).
     
     Args:
         all_files: Dictionary of files from discover_all_files()
         variable_names: List of variable names
+        writer: Open ParquetWriter (RESULT_SCHEMA) that receives each file's records
         progress_callback: Optional callback function for progress updates
+        cache_dir: Optional stats cache directory (see process_single_grib_file)
         
     Returns:
-        DataFrame with all statistics
+        Number of records written
     """
-    all_results = []
+    n_records = 0
     total_files = sum(
         len(files) 
         for date_files in all_files.values() 
         for files in date_files.values()
     )
     processed = 0
+    pending = []
     
-    for date_str, init_hours in all_files.items():
-        for init_hour, files in init_hours.items():
-            logger.info(f"Processing {date_str}/{init_hour}: {len(files)} files")
-            
-            for file_path in files:
-                results = process_single_grib_file(file_path, variable_names)
-                all_results.extend(results)
-                
-                processed += 1
-                if progress_callback:
-                    progress_callback(processed, total_files)
+    # tqdm throttles its own refreshes, so there is no per-file log formatting
+    with tqdm(total=total_files, desc="Processing files", unit="file") as pbar:
+        for date_str, init_hours in all_files.items():
+            for init_hour, files in init_hours.items():
+                pbar.set_postfix_str(f"{date_str}/{init_hour}")
                 
-                if processed % 10 == 0:
-                    logger.info(f"Progress: {processed}/{total_files} files ({100*processed/total_files:.1f}%)")
+                for file_path, results in iter_file_results(files, variable_names, cache_dir):
+                    pending.extend(results)
+                    
+                    processed += 1
+                    pbar.update()
+                    if progress_callback:
+                        progress_callback(processed, total_files)
+                    
+                    # Buffer a few files per record batch so row groups stay reasonably sized
+                    if processed % WRITE_EVERY_FILES == 0:
+                        n_records += _write_records(writer, pending)
+                        pending.clear()
+    
+    n_records += _write_records(writer, pending)
     
-    return pd.DataFrame(all_results)
+    return n_records
 
 
 def process_all_files_parallel(all_files: dict, 
                                 variable_names: list,
+                                writer: pq.ParquetWriter,
                                 n_workers: int = 4,
-                                batch_size: int = 20) -> pd.DataFrame:
+                                batch_size: int = 20,
+                                scheduler: str = 'processes',
+                                cache_dir: Path = None) -> int:
     """
-    Process all GRIB files in parallel using Dask.
+    Process all GRIB files in parallel using a process pool.
+    
+    Each task (one GRIB file -> ~16 records) is small, so a plain
+    ProcessPoolExecutor with chunked submission beats a Dask cluster, whose
+    scheduler round-trips and startup dominate at this granularity.
+    
+    Workers are spawned rather than forked: forking after the parent has started
+    Numba's threading layer (the TBB backend in particular) leaves the pool's
+    children holding its state and the interpreter hangs at exit.
     
     Args:
         all_files: Dictionary of files from discover_all_files()
         variable_names: List of variable names
-        n_workers: Number of Dask workers
-        batch_size: Number of files to process per batch
+        writer: Open ParquetWriter (RESULT_SCHEMA) that receives each file's records
+        n_workers: Number of worker processes
+        batch_size: Number of files per pool task (read ahead within the task)
+        scheduler: 'processes' (default) or 'dask' to use a Dask LocalCluster
+        cache_dir: Optional stats cache directory (see process_single_grib_file)
         
     Returns:
-        DataFrame with all statistics
+        Number of records written
     """
     # Flatten file list
     flat_files = []
@@ -388,7 +715,51 @@ def process_all_files_parallel(all_files: dict,
             flat_files.extend(files)
     
     total_files = len(flat_files)
-    logger.info(f"Processing {total_files} files in parallel with {n_workers} workers")
+    logger.info(f"Processing {total_files} files in parallel with {n_workers} workers ({scheduler})")
+    
+    if scheduler == 'dask':
+        return _process_files_dask(flat_files, variable_names, writer, n_workers, batch_size, cache_dir)
+    
+    n_records = 0
+    processed = 0
+    pending = []
+    worker = partial(_process_file_batch, variable_names=variable_names, cache_dir=cache_dir)
+    # Each task is a batch so the worker can read ahead within it
+    batches = [flat_files[i:i + batch_size] for i in range(0, total_files, batch_size)]
+    
+    with ProcessPoolExecutor(max_workers=n_workers,
+                             mp_context=multiprocessing.get_context('spawn'),
+                             initializer=_pool_worker_init) as executor:
+        for batch_results in executor.map(worker, batches):
+            for file_results in batch_results:
+                pending.extend(file_results)
+                processed += 1
+                
+                # Buffer a few files per record batch so row groups stay reasonably sized
+                if processed % WRITE_EVERY_FILES == 0:
+                    n_records += _write_records(writer, pending)
+                    pending.clear()
+            
+            logger.info(f"Progress: {processed}/{total_files} files. Records written: {n_records}")
+    
+    n_records += _write_records(writer, pending)
+    
+    return n_records
+
+
+def _process_files_dask(flat_files: list,
+                        variable_names: list,
+                        writer: pq.ParquetWriter,
+                        n_workers: int,
+                        batch_size: int,
+                        cache_dir: Path = None) -> int:
+    """
+    Opt-in Dask fallback for process_all_files_parallel (--scheduler dask).
+    """
+    import dask
+    from dask.distributed import Client, LocalCluster
+    
+    total_files = len(flat_files)
     
     # Set up Dask cluster
     cluster = LocalCluster(
@@ -399,7 +770,9 @@ def process_all_files_parallel(all_files: dict,
     client = Client(cluster)
     logger.info(f"Dask Dashboard: {client.dashboard_link}")
     
-    all_results = []
+    n_records = 0
+    processed = 0
+    pending = []
     
     try:
         # Process in batches to manage memory
@@ -412,7 +785,7 @@ def process_all_files_parallel(all_files: dict,
             
             # Create delayed tasks
             tasks = [
-                process_grib_file_delayed(f, variable_names) 
+                dask.delayed(process_single_grib_file)(f, variable_names, cache_dir=cache_dir) 
                 for f in batch_files
             ]
             
@@ -421,68 +794,99 @@ def process_all_files_parallel(all_files: dict,
             
             # Flatten results
             for file_results in batch_results:
-                all_results.extend(file_results)
+                pending.extend(file_results)
+                processed += 1
+                
+                # Buffer a few files per record batch so row groups stay reasonably sized
+                if processed % WRITE_EVERY_FILES == 0:
+                    n_records += _write_records(writer, pending)
+                    pending.clear()
             
-            logger.info(f"Batch complete. Total records: {len(all_results)}")
+            logger.info(f"Batch complete. Records written: {n_records}")
+        
+        n_records += _write_records(writer, pending)
     
     finally:
         client.close()
         cluster.close()
     
-    return pd.DataFrame(all_results)
+    return n_records
 
 
 # ==============================================================================
 # OUTPUT FUNCTIONS
 # ==============================================================================
 
-def save_results(df: pd.DataFrame, output_dir: Path, output_name: str = None):
+def default_output_name() -> str:
     """
-    Save results to CSV and summary files.
+    Timestamped base name shared by the Parquet results and CSV summaries.
+    """
+    return f"jfwprb_statistics_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+
+
+def _arrow_summary(table: pa.Table, keys: list, aggregations: list) -> pd.DataFrame:
+    """
+    Hash-aggregate an Arrow table and return the (small) result as a sorted,
+    key-indexed DataFrame. Output columns are named '{column}_{function}'.
+    """
+    grouped = table.group_by(keys).aggregate(aggregations)
+    value_cols = [f'{col}_{func}' for col, func in aggregations]
+    return (grouped.select(keys + value_cols)
+                   .sort_by([(k, 'ascending') for k in keys])
+                   .to_pandas()
+                   .set_index(keys)
+                   .round(6))
+
+
+def save_results(results_path: Path, output_dir: Path, output_name: str = None):
+    """
+    Save summary files for results already streamed to Parquet.
+    
+    The aggregation runs on the Arrow table read straight from Parquet, so the
+    full result set is never materialized as a pandas DataFrame.
     
     Args:
-        df: Results DataFrame
+        results_path: Parquet file written during processing
         output_dir: Output directory path
         output_name: Optional custom output name
     """
     output_dir.mkdir(parents=True, exist_ok=True)
     
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    
     if output_name is None:
-        output_name = f'jfwprb_statistics_{timestamp}'
+        output_name = default_output_name()
     
-    # Save full results
-    csv_path = output_dir / f'{output_name}.csv'
-    df.to_csv(csv_path, index=False)
-    logger.info(f"Saved full results to: {csv_path}")
+    table = pq.read_table(results_path, columns=[
+        'date', 'init_hour', 'variable', 'max', 'min', 'median', 'mean', 'nonzero_count'
+    ])
     
     # Create summary by variable
-    summary = df.groupby('variable').agg({
-        'max': ['max', 'mean'],
-        'min': ['min', 'mean'],
-        'median': 'mean',
-        'mean': 'mean',
-        'nonzero_count': 'sum'
-    }).round(6)
+    summary = _arrow_summary(table, ['variable'], [
+        ('max', 'max'),
+        ('max', 'mean'),
+        ('min', 'min'),
+        ('min', 'mean'),
+        ('median', 'mean'),
+        ('mean', 'mean'),
+        ('nonzero_count', 'sum')
+    ])
     
     summary_path = output_dir / f'{output_name}_summary.csv'
     summary.to_csv(summary_path)
     logger.info(f"Saved summary to: {summary_path}")
     
     # Create summary by date/init
-    date_init_summary = df.groupby(['date', 'init_hour', 'variable']).agg({
-        'max': 'max',
-        'min': 'min',
-        'median': 'mean',
-        'mean': 'mean'
-    }).round(6)
+    date_init_summary = _arrow_summary(table, ['date', 'init_hour', 'variable'], [
+        ('max', 'max'),
+        ('min', 'min'),
+        ('median', 'mean'),
+        ('mean', 'mean')
+    ])
     
     date_summary_path = output_dir / f'{output_name}_by_date_init.csv'
     date_init_summary.to_csv(date_summary_path)
     logger.info(f"Saved date/init summary to: {date_summary_path}")
     
-    return csv_path, summary_path, date_summary_path
+    return summary_path, date_summary_path
 
 
 def print_summary(df: pd.DataFrame):
@@ -502,14 +906,20 @@ def print_summary(df: pd.DataFrame):
     print(f"\n{'Variable':<10} {'Max':<12} {'Min':<12} {'Median':<12} {'Mean':<12}")
     print("-" * 60)
     
-    for var in VARIABLE_NAMES:
-        var_data = df[df['variable'] == var]
-        if not var_data.empty:
-            print(f"{var:<10} "
-                  f"{var_data['max'].max():<12.6f} "
-                  f"{var_data['min'].min():<12.6f} "
-                  f"{var_data['median'].mean():<12.6f} "
-                  f"{var_data['mean'].mean():<12.6f}")
+    # One hashed grouping pass, then reindex to keep the canonical variable order
+    agg = df.groupby('variable', sort=False).agg(
+        max=('max', 'max'),
+        min=('min', 'min'),
+        median=('median', 'mean'),
+        mean=('mean', 'mean')
+    ).reindex(VARIABLE_NAMES).dropna(how='all')
+    
+    for var, row in agg.iterrows():
+        print(f"{var:<10} "
+              f"{row['max']:<12.6f} "
+              f"{row['min']:<12.6f} "
+              f"{row['median']:<12.6f} "
+              f"{row['mean']:<12.6f}")
     
     print("=" * 60)
 
@@ -552,13 +962,20 @@ def main():
     parser.add_argument(
         '--parallel', 
         action='store_true',
-        help='Use parallel processing with Dask'
+        help='Use parallel processing'
+    )
+    parser.add_argument(
+        '--scheduler', 
+        type=str, 
+        choices=['processes', 'dask'],
+        default='processes',
+        help='Parallel backend: process pool (default) or Dask LocalCluster'
     )
     parser.add_argument(
         '--workers', 
         type=int, 
         default=4,
-        help='Number of Dask workers for parallel processing'
+        help='Number of workers for parallel processing'
     )
     parser.add_argument(
         '--batch-size', 
@@ -566,6 +983,17 @@ def main():
         default=20,
         help='Batch size for parallel processing'
     )
+    parser.add_argument(
+        '--show-size', 
+        action='store_true',
+        help='Report total size of discovered files (one stat per file)'
+    )
+    parser.add_argument(
+        '--cache-dir', 
+        type=str, 
+        default=None,
+        help='Enable the per-file stats cache in this directory (default: disabled)'
+    )
     parser.add_argument(
         '--output-name', 
         type=str, 
@@ -578,6 +1006,7 @@ def main():
     # Update paths
     data_dir = Path(args.data_dir)
     output_dir = Path(args.output_dir)
+    cache_dir = Path(args.cache_dir) if args.cache_dir else None
     
     logger.info("=" * 60)
     logger.info("JFWPRB STATISTICS CALCULATOR")
@@ -587,42 +1016,55 @@ def main():
     logger.info(f"Date filter: {args.date or 'All'}")
     logger.info(f"Init hour filter: {args.init_hour or 'All'}")
     logger.info(f"Processing mode: {'Parallel' if args.parallel else 'Sequential'}")
+    logger.info(f"Stats cache: {cache_dir or 'Disabled'}")
     
     # Discover files
     logger.info("\nDiscovering files...")
     all_files = discover_all_files(
         data_dir, 
         date_filter=args.date, 
-        init_filter=args.init_hour
+        init_filter=args.init_hour,
+        show_size=args.show_size
     )
     
     if not any(all_files.values()):
         logger.error("No files found to process!")
         return 1
     
-    # Process files
+    # Process files, streaming each file's records straight to Parquet
     logger.info("\nProcessing files...")
     start_time = datetime.now()
     
-    if args.parallel:
-        df = process_all_files_parallel(
-            all_files, 
-            VARIABLE_NAMES,
-            n_workers=args.workers,
-            batch_size=args.batch_size
-        )
-    else:
-        df = process_all_files_sequential(all_files, VARIABLE_NAMES)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    output_name = args.output_name or default_output_name()
+    results_path = output_dir / f'{output_name}.parquet'
+    
+    with pq.ParquetWriter(results_path, RESULT_SCHEMA, compression='zstd') as writer:
+        if args.parallel:
+            n_records = process_all_files_parallel(
+                all_files, 
+                VARIABLE_NAMES,
+                writer,
+                n_workers=args.workers,
+                batch_size=args.batch_size,
+                scheduler=args.scheduler,
+                cache_dir=cache_dir
+            )
+        else:
+            n_records = process_all_files_sequential(all_files, VARIABLE_NAMES, writer, cache_dir=cache_dir)
     
     elapsed = datetime.now() - start_time
     logger.info(f"\nProcessing complete in {elapsed}")
+    logger.info(f"Saved {n_records:,} records to: {results_path}")
     
-    # Save results
+    # Save summaries
     logger.info("\nSaving results...")
-    save_results(df, output_dir, args.output_name)
+    save_results(results_path, output_dir, output_name)
     
     # Print summary
-    print_summary(df)
+    print_summary(pd.read_parquet(results_path, columns=[
+        'date', 'init_hour', 'forecast_hour', 'variable', 'max', 'min', 'median', 'mean'
+    ]))
     
     return 0
 
@@ -9,6 +9,7 @@ and standardizes units to US Imperial or Metric.
 Usage:
     import nbm_grib_tools
     df = nbm_grib_tools.index_nbm5_grib("blend.t00z.qmd.f024.co.grib2")
+    df = nbm_grib_tools.index_many(["blend.t00z.qmd.f024.co.grib2", "blend.t00z.qmd.f048.co.grib2"])
 
 Author:   Michael Wessler
 Email:    michael.wessler@noaa.gov
@@ -19,9 +20,12 @@ Created:  2026
 import struct
 import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from functools import lru_cache, partial
 import pandas as pd
 from eccodes import *
+from eccodes import CodesInternalError
 
 # ====================================================================================
 #  CONSTANTS & LOOKUP TABLES
@@ -91,8 +95,40 @@ ID_LOOKUP = {
     (10, 3, 204): {'name': 'Significant Wave Height', 'units': 'm'},
 }
 
+# ID_LOOKUP re-keyed on a single packed int, (d << 16) | (c << 8) | n, so the per-message
+# lookup hashes one small int instead of building and hashing a 3-tuple
+_ID_LOOKUP_INT = {(d << 16) | (c << 8) | n: v for (d, c, n), v in ID_LOOKUP.items()}
+_KEY_SNOWLVL_CWASP = (0 << 16) | (19 << 8) | 239
+_KEY_SNOW_RATIO = (0 << 16) | (1 << 8) | 29
+
 PTYPE_MAP = {1: 'Rain', 5: 'Snow', 3: 'Freezing Rain', 8: 'Ice Pellets'}
 
+# shortNames for resolved names whose ecCodes shortName is 'unknown'
+_RECOVERED_SHORT_NAMES = {
+    'Ceiling': 'CEIL', 'Total Cloud Cover': 'TCC', 'Icing Severity': 'ICSEV',
+    'Predominant Weather': 'WX', 'Echo Top': 'ECHOTOP', 'Ellrod Index': 'ELLROD',
+    'Dry Thunderstorm Prob': 'DRYTS', 'Transport Wind Speed': 'TRWSPD', 'Transport Wind Direction': 'TRWDIR',
+}
+
+@lru_cache(maxsize=1024)
+def _name_flags(name, short_name):
+    """(is_ptype, has_type, is_unknown) for a resolved name/shortName; a file only has a handful, so memoized."""
+    return 'Precipitation Type' in name, 'Type' in name, 'Unknown' in name or 'unknown' in short_name
+
+# Unit-only imperial conversions (see _to_imperial); 'm' depends on whether the field is an accumulation
+ACCUM_VARS = ['APCP', 'ASNOW', 'SNOD', 'FICEAC', 'TICE', 'SNOWLR', 'WEASD']
+_IMPERIAL_UNITS = {'K': 'F', 'm s**-1': 'mph', 'kg m**-2': 'in', 'mm': 'in', 'cm': 'in'}
+
+# Big-endian section length at the start of every GRIB2 section
+_U32 = struct.Struct('>I')
+
+# Section 2 local text tokens, e.g. 'RH_le_35' -> ('RH', 'le', '35')
+_LOCAL_RE = re.compile(r"([A-Za-z0-9]+)_(le|lt|ge|gt|eq|ne)_([0-9.]+)")
+_OPS = {'le': '<=', 'lt': '<', 'ge': '>=', 'gt': '>', 'eq': '=', 'ne': '!='}
+
+# Output column order of index_nbm5_grib
+INDEX_COLUMNS = ['msg_id', 'grib_header', 'shortName', 'name', 'init_time', 'f_hour', 'valid_time', 'stepRange', 'stepType', 'level', 'typeOfLevel', 'param_type', 'percentile', 'threshold_condition', 'threshold', 'units', 'threshold_condition_joint', 'threshold_joint', 'units_joint', 'full_desc']
+
 # ====================================================================================
 #  INTERNAL HELPER FUNCTIONS
 # ====================================================================================
@@ -100,10 +136,14 @@ PTYPE_MAP = {1: 'Rain', 5: 'Snow', 3: 'Freezing Rain', 8: 'Ice Pellets'}
 def _get_datetime(gid, date_key, time_key):
     """Safe extraction of datetime objects from GRIB keys."""
     try:
-        d = codes_get(gid, date_key)
-        t = codes_get(gid, time_key)
-        return datetime.strptime(f"{d}{t:04d}", "%Y%m%d%H%M")
-    except: 
+        d = codes_get_long(gid, date_key)
+        t = codes_get_long(gid, time_key)
+        # YYYYMMDD / HHMM integers split arithmetically; avoids formatting + strptime
+        year, month_day = divmod(d, 10000)
+        month, day = divmod(month_day, 100)
+        hour, minute = divmod(t, 100)
+        return datetime(year, month, day, hour, minute)
+    except (CodesInternalError, ValueError):
         return None
 
 def _apply_scale(raw_value, scale_factor):
@@ -116,14 +156,34 @@ def _apply_scale(raw_value, scale_factor):
 def _get_derived_type(gid):
     """Decodes Derived Forecast Type (Table 4.7)."""
     try:
-        code = codes_get(gid, 'derivedForecast')
+        code = codes_get_long(gid, 'derivedForecast')
         mapping = {
             0: "Mean", 1: "Weighted Mean", 2: "Std Dev", 4: "Spread",
             192: "Deterministic", # Unweighted Mode
             241: "Deterministic"  # Most Probable
         }
         return mapping.get(code, f"Derived Type {code}")
-    except: return None
+    except CodesInternalError: return None
+
+def _resolve_snowlvl_cwasp(pdt, row, grib_units, raw_short):
+    """Resolves the (0, 19, 239) collision: Snow Level vs CWASP Index."""
+    if pdt in [5, 9] or pdt in [2, 12]:
+        return 'CWASP Index', '%', 'CWASP'
+    if row['typeOfLevel'] == 'meanSea' or grib_units == 'm':
+        return 'Snow Level', 'm', 'SNOWLVL'
+    return 'CWASP Index', '%', 'CWASP'
+
+def _resolve_snow_ratio(pdt, row, grib_units, raw_short):
+    """Resolves the (0, 1, 29) collision: Total Snowfall vs Snow Ratio."""
+    if pdt in [5, 9] or row['stepType'] == 'accum' or raw_short == 'ASNOW':
+        return 'Total Snowfall', 'm', 'ASNOW'
+    return 'Snow Ratio', 'ratio', 'SNOWLR'
+
+# Packed (d, c, n) keys that need message context to pick a name, dispatched in one lookup
+_COLLISION_RESOLVERS = {
+    _KEY_SNOWLVL_CWASP: _resolve_snowlvl_cwasp,
+    _KEY_SNOW_RATIO: _resolve_snow_ratio,
+}
 
 def _to_imperial(val, unit, short_name):
     """Robust conversion to US Imperial Units."""
@@ -140,8 +200,7 @@ def _to_imperial(val, unit, short_name):
     
     # Length / Accumulation: Meters -> Inches or Feet
     if unit == 'm':
-        accum_vars = ['APCP', 'ASNOW', 'SNOD', 'FICEAC', 'TICE', 'SNOWLR', 'WEASD']
-        if short_name in accum_vars: return val * 39.3701, 'in'
+        if short_name in ACCUM_VARS: return val * 39.3701, 'in'
         else: return val * 3.28084, 'ft'
 
     # Precip Amount: kg/m^2 (mm) -> Inches
@@ -161,17 +220,15 @@ def _format_val(val, unit):
 def _parse_local_text_full(text):
     """Parses hidden Section 2 ASCII text (e.g., 'RH_le_35_WSPD_ge_10')."""
     if not text: return None, []
-    ops = {'le': '<=', 'lt': '<', 'ge': '>=', 'gt': '>', 'eq': '=', 'ne': '!='}
-    pattern = re.compile(r"([A-Za-z0-9]+)_(le|lt|ge|gt|eq|ne)_([0-9\.]+)")
-    matches = pattern.findall(text)
+    matches = _LOCAL_RE.findall(text)
     if not matches: return text, []
     
     desc_parts, parsed_items = [], []
     for var, op, val in matches:
-        readable_op = ops.get(op, op)
+        readable_op = _OPS.get(op, op)
         desc_parts.append(f"{var} {readable_op} {val}")
         try: numeric_val = float(val)
-        except: numeric_val = None
+        except ValueError: numeric_val = None
         parsed_items.append({'var': var, 'op': readable_op, 'val': numeric_val})
         
     full_readable = "Prob " + " & ".join(desc_parts)
@@ -182,7 +239,17 @@ def _parse_local_text_full(text):
 # ====================================================================================
 
 def index_nbm5_grib(filename, convert_imperial=True):
-    data = []
+    # Collected column-wise so the DataFrame is built from one list per column
+    cols = {name: [] for name in INDEX_COLUMNS}
+    units_only_rows = []
+    time_strs = {}
+    # Per-message hot path: bind globals to locals (LOAD_FAST instead of LOAD_GLOBAL + dict lookup)
+    _get_long = codes_get_long
+    _get_str = codes_get_string
+    _unit = UNIT_LOOKUP.get
+    _id = _ID_LOOKUP_INT.get
+    _ptype = PTYPE_MAP
+    _flags = _name_flags
     print(f"[nbm_grib_tools] Indexing {filename}...")
 
     with open(filename, 'rb') as f:
@@ -200,73 +267,73 @@ def index_nbm5_grib(filename, convert_imperial=True):
                 'threshold_joint': None, 'threshold_condition_joint': None, 'units_joint': None,
                 'full_desc': None
             }
+            # Set when only the units (no value) need converting; done vectorized after the loop
+            units_only = False
 
             try:
                 # --- READ METADATA ---
-                d = codes_get(gid, 'discipline')
-                c = codes_get(gid, 'parameterCategory')
-                n = codes_get(gid, 'parameterNumber')
-                raw_short = codes_get(gid, 'shortName')
+                d = _get_long(gid, 'discipline')
+                c = _get_long(gid, 'parameterCategory')
+                n = _get_long(gid, 'parameterNumber')
+                raw_short = _get_str(gid, 'shortName')
                 
-                row['level'] = codes_get(gid, 'level')
-                row['typeOfLevel'] = codes_get(gid, 'typeOfLevel')
-                row['stepRange'] = codes_get(gid, 'stepRange')
-                row['stepType'] = codes_get(gid, 'stepType')
+                row['level'] = _get_long(gid, 'level')
+                row['typeOfLevel'] = _get_str(gid, 'typeOfLevel')
+                row['stepRange'] = _get_str(gid, 'stepRange')
+                row['stepType'] = _get_str(gid, 'stepType')
                 
-                try: pdt = codes_get(gid, 'productDefinitionTemplateNumber')
-                except: pdt = 0
-                try: grib_units = codes_get(gid, 'units')
-                except: grib_units = '-'
+                try: pdt = _get_long(gid, 'productDefinitionTemplateNumber')
+                except CodesInternalError: pdt = 0
+                try: grib_units = _get_str(gid, 'units')
+                except CodesInternalError: grib_units = '-'
 
                 row['init_time'] = _get_datetime(gid, 'dataDate', 'dataTime')
                 row['valid_time'] = _get_datetime(gid, 'validityDate', 'validityTime')
+                # Generic getter on purpose: a non-hour step keeps its unit (e.g. '90m') instead of a bare int
                 row['f_hour'] = codes_get(gid, 'startStep')
-                time_str = row['init_time'].strftime("%Y%m%d%H") if row['init_time'] else "T-UNK"
+                # Every message in a file normally shares one reference time; format it once
+                time_str = time_strs.get(row['init_time'])
+                if time_str is None:
+                    time_str = row['init_time'].strftime("%Y%m%d%H") if row['init_time'] else "T-UNK"
+                    time_strs[row['init_time']] = time_str
 
                 # --- 1. RESOLVE NAME/UNITS (COLLISION HANDLING) ---
-                if (d, c, n) == (0, 19, 239):
-                    is_prob = (pdt in [5, 9])
-                    is_derived = (pdt in [2, 12])
-                    if is_prob or is_derived: 
-                        row['name'], row['units'], row['shortName'] = 'CWASP Index', '%', 'CWASP'
-                    elif row['typeOfLevel'] == 'meanSea': 
-                        row['name'], row['units'], row['shortName'] = 'Snow Level', 'm', 'SNOWLVL'
-                    else:
-                        if grib_units == 'm': row['name'], row['units'], row['shortName'] = 'Snow Level', 'm', 'SNOWLVL'
-                        else: row['name'], row['units'], row['shortName'] = 'CWASP Index', '%', 'CWASP'
-                
-                elif (d, c, n) == (0, 1, 29):
-                    is_prob = (pdt in [5, 9])
-                    is_accum = (row['stepType'] == 'accum')
-                    if is_prob or is_accum or raw_short == 'ASNOW':
-                        row['name'], row['units'], row['shortName'] = 'Total Snowfall', 'm', 'ASNOW'
-                    else:
-                        row['name'], row['units'], row['shortName'] = 'Snow Ratio', 'ratio', 'SNOWLR'
-
-                elif (d, c, n) in ID_LOOKUP:
-                    entry = ID_LOOKUP[(d, c, n)]
+                key = (d << 16) | (c << 8) | n
+                entry = _id(key)
+                resolver = _COLLISION_RESOLVERS.get(key)
+                if resolver is not None:
+                    row['name'], row['units'], row['shortName'] = resolver(pdt, row, grib_units, raw_short)
+                elif entry is not None:
                     row['name'], row['units'], row['shortName'] = entry['name'], entry['units'], raw_short
-                elif codes_get(gid, 'name') != 'unknown':
-                    row['name'], row['units'], row['shortName'] = codes_get(gid, 'name'), grib_units, raw_short
                 else:
-                    row['name'], row['units'], row['shortName'] = f"Unknown (D{d}-C{c}-N{n})", grib_units, f"unk_{d}_{c}_{n}"
+                    eccodes_name = _get_str(gid, 'name')
+                    if eccodes_name != 'unknown':
+                        row['name'], row['units'], row['shortName'] = eccodes_name, grib_units, raw_short
+                    else:
+                        row['name'], row['units'], row['shortName'] = f"Unknown (D{d}-C{c}-N{n})", grib_units, f"unk_{d}_{c}_{n}"
+                is_ptype, has_type, is_unknown = _flags(row['name'], row['shortName'])
 
                 # --- 2. HIDDEN TEXT CHECK ---
                 local_text = None
-                msg_bytes = codes_get_message(gid)
-                offset = 16
-                sec1_len = struct.unpack('>I', msg_bytes[offset:offset+4])[0]
-                offset += sec1_len
-                sec2_len = struct.unpack('>I', msg_bytes[offset:offset+4])[0]
-                sec2_num = msg_bytes[offset+4]
-                if sec2_num == 2:
-                    data_start = offset + 6
-                    data_end = offset + sec2_len
-                    try:
-                        raw = msg_bytes[data_start:data_end]
-                        decoded = raw.replace(b'\x00', b'').decode('ascii').strip()
-                        if len(decoded) > 1 and any(ch.isalpha() for ch in decoded): local_text = decoded
-                    except: pass
+                # Section 2 is optional and absent from most messages; only copy the full
+                # message out of ecCodes when it carries a local-use payload
+                try: has_local = _get_long(gid, 'section2Length') > 5
+                except CodesInternalError: has_local = False
+                if has_local:
+                    msg_bytes = codes_get_message(gid)
+                    offset = 16
+                    sec1_len = _U32.unpack_from(msg_bytes, offset)[0]
+                    offset += sec1_len
+                    sec2_len = _U32.unpack_from(msg_bytes, offset)[0]
+                    sec2_num = msg_bytes[offset+4]
+                    if sec2_num == 2:
+                        data_start = offset + 6
+                        data_end = offset + sec2_len
+                        try:
+                            raw = msg_bytes[data_start:data_end]
+                            decoded = raw.replace(b'\x00', b'').decode('ascii').strip()
+                            if len(decoded) > 1 and any(ch.isalpha() for ch in decoded): local_text = decoded
+                        except UnicodeDecodeError: pass
 
                 # --- 3. PARSING ---
                 if local_text:
@@ -275,7 +342,7 @@ def index_nbm5_grib(filename, convert_imperial=True):
                         row['param_type'] = 'Probability'
                         row['threshold'] = items[0]['val']
                         row['threshold_condition'] = items[0]['op']
-                        row['units'] = UNIT_LOOKUP.get(items[0]['var'], 'Unknown')
+                        row['units'] = _unit(items[0]['var'], 'Unknown')
                         var_names = [items[0]['var']]
                         
                         if convert_imperial:
@@ -285,13 +352,14 @@ def index_nbm5_grib(filename, convert_imperial=True):
                             row['param_type'] = 'Joint Probability'
                             row['threshold_joint'] = items[1]['val']
                             row['threshold_condition_joint'] = items[1]['op']
-                            row['units_joint'] = UNIT_LOOKUP.get(items[1]['var'], 'Unknown')
+                            row['units_joint'] = _unit(items[1]['var'], 'Unknown')
                             var_names.append(items[1]['var'])
                             if convert_imperial:
                                 row['threshold_joint'], row['units_joint'] = _to_imperial(row['threshold_joint'], row['units_joint'], items[1]['var'])
 
                         row['name'] = f"Prob ({' & '.join(var_names)})"
                         row['shortName'] = "JFWPRB" if len(items) > 1 else raw_short
+                        is_unknown = _flags(row['name'], row['shortName'])[2]
                         
                         desc_parts = []
                         if row['threshold'] is not None: 
@@ -301,79 +369,103 @@ def index_nbm5_grib(filename, convert_imperial=True):
                         row['full_desc'] = "Prob " + " & ".join(desc_parts) + f" ({row['units']})"
                     else:
                         row['name'] = f"{local_text} [ASCII]"
+                        is_unknown = _flags(row['name'], row['shortName'])[2]
                         row['full_desc'] = row['name']
                         row['param_type'] = 'Local'
                 else:
                     try:
                         if pdt in [6, 10]:
                             row['param_type'] = 'Percentile'
-                            val = codes_get(gid, 'percentileValue')
+                            val = _get_long(gid, 'percentileValue')
                             row['percentile'] = val if val != 255 else None
-                            if convert_imperial: _, row['units'] = _to_imperial(0, row['units'], row['shortName'])
+                            units_only = True
                             row['full_desc'] = f"{row['name']} ({row['percentile']}th Pct)"
 
                         elif pdt in [5, 9]:
                             row['param_type'] = 'Probability'
-                            prob_type = codes_get(gid, 'probabilityType')
-                            if prob_type == 0: raw_val, scale, cond = codes_get(gid, 'scaledValueOfLowerLimit'), codes_get(gid, 'scaleFactorOfLowerLimit'), '<'
-                            elif prob_type == 1: raw_val, scale, cond = codes_get(gid, 'scaledValueOfUpperLimit'), codes_get(gid, 'scaleFactorOfUpperLimit'), '>'
+                            prob_type = _get_long(gid, 'probabilityType')
+                            if prob_type == 0: raw_val, scale, cond = _get_long(gid, 'scaledValueOfLowerLimit'), _get_long(gid, 'scaleFactorOfLowerLimit'), '<'
+                            elif prob_type == 1: raw_val, scale, cond = _get_long(gid, 'scaledValueOfUpperLimit'), _get_long(gid, 'scaleFactorOfUpperLimit'), '>'
                             elif prob_type == 2:
-                                lower = _apply_scale(codes_get(gid, 'scaledValueOfLowerLimit'), codes_get(gid, 'scaleFactorOfLowerLimit'))
-                                if 'Precipitation Type' in row['name'] and int(lower) in PTYPE_MAP:
+                                lower = _apply_scale(_get_long(gid, 'scaledValueOfLowerLimit'), _get_long(gid, 'scaleFactorOfLowerLimit'))
+                                if is_ptype and int(lower) in _ptype:
                                     row['threshold'], row['threshold_condition'] = int(lower), '=='
-                                    row['full_desc'] = f"Prob Type = {PTYPE_MAP[int(lower)]}"
+                                    row['full_desc'] = f"Prob Type = {_ptype[int(lower)]}"
                                     raw_val, scale, cond = None, 0, '=='
                                 else:
-                                    raw_val, scale, cond = codes_get(gid, 'scaledValueOfLowerLimit'), codes_get(gid, 'scaleFactorOfLowerLimit'), 'between'
-                            else: raw_val, scale, cond = codes_get(gid, 'scaledValueOfLowerLimit'), codes_get(gid, 'scaleFactorOfLowerLimit'), '?'
+                                    raw_val, scale, cond = _get_long(gid, 'scaledValueOfLowerLimit'), _get_long(gid, 'scaleFactorOfLowerLimit'), 'between'
+                            else: raw_val, scale, cond = _get_long(gid, 'scaledValueOfLowerLimit'), _get_long(gid, 'scaleFactorOfLowerLimit'), '?'
 
                             if prob_type != 2:
                                 val = _apply_scale(raw_val, scale)
-                                if convert_imperial and 'Type' not in row['name']: val, row['units'] = _to_imperial(val, row['units'], row['shortName'])
+                                if convert_imperial and not has_type: val, row['units'] = _to_imperial(val, row['units'], row['shortName'])
                                 row['threshold'], row['threshold_condition'] = val, cond
                                 row['full_desc'] = f"Prob {row['name']} {cond} {_format_val(val, row['units'])} {row['units']}"
 
                         elif pdt in [2, 12]:
                             d_type = _get_derived_type(gid)
                             row['param_type'] = d_type if d_type else 'Deterministic'
-                            if convert_imperial: _, row['units'] = _to_imperial(0, row['units'], row['shortName'])
+                            units_only = True
                             row['full_desc'] = f"{row['name']} ({row['param_type']})"
                         else:
-                            if convert_imperial: _, row['units'] = _to_imperial(0, row['units'], row['shortName'])
+                            units_only = True
                             row['full_desc'] = row['name']
-                    except: row['full_desc'] = f"{row['name']} (Error)"
-
-                if row['stepType'] and row['stepType'] != 'instant':
-                    row['full_desc'] += f" [{row['stepRange']} hr {row['stepType']}]"
+                    except (CodesInternalError, TypeError, ValueError): row['full_desc'] = f"{row['name']} (Error)"
 
                 # --- 4. CLEANUP FOR "UNKNOWN" ---
                 # Recover Names/ShortNames if ID lookup missed but we have clues
-                if 'Unknown' in row['name'] or 'unknown' in row['shortName']:
+                if is_unknown:
                      if local_text and 'Cloud' in local_text:
                          row['name'] = local_text
                          row['shortName'] = local_text.upper()[:8]
                      
-                     if row['name'] == 'Ceiling': row['shortName'] = 'CEIL'
-                     elif row['name'] == 'Total Cloud Cover': row['shortName'] = 'TCC'
-                     elif row['name'] == 'Icing Severity': row['shortName'] = 'ICSEV'
-                     elif row['name'] == 'Predominant Weather': row['shortName'] = 'WX'
-                     elif row['name'] == 'Echo Top': row['shortName'] = 'ECHOTOP'
-                     elif row['name'] == 'Ellrod Index': row['shortName'] = 'ELLROD'
-                     elif row['name'] == 'Dry Thunderstorm Prob': row['shortName'] = 'DRYTS'
-                     elif row['name'] == 'Transport Wind Speed': row['shortName'] = 'TRWSPD'
-                     elif row['name'] == 'Transport Wind Direction': row['shortName'] = 'TRWDIR'
+                     recovered = _RECOVERED_SHORT_NAMES.get(row['name'])
+                     if recovered: row['shortName'] = recovered
 
                 # --- 5. CLEAN HEADER GENERATION (AFTER FIXES) ---
                 # Regenerate header so it reflects the corrected shortName/Name
                 row['grib_header'] = f"{count}:{row['shortName']}:{row['typeOfLevel']}={row['level']}:{row['stepRange']}hr {row['stepType']}:d={time_str}"
 
-                data.append(row)
+                for name in INDEX_COLUMNS: cols[name].append(row[name])
+                units_only_rows.append(units_only)
             except Exception: pass
             finally: codes_release(gid)
 
-    df = pd.DataFrame(data)
-    cols_order = ['msg_id', 'grib_header', 'shortName', 'name', 'init_time', 'f_hour', 'valid_time', 'stepRange', 'stepType', 'level', 'typeOfLevel', 'param_type', 'percentile', 'threshold_condition', 'threshold', 'units', 'threshold_condition_joint', 'threshold_joint', 'units_joint', 'full_desc']
-    return df[[c for c in cols_order if c in df.columns]]
+    cols['init_time'] = pd.to_datetime(cols['init_time'], errors='coerce')
+    cols['valid_time'] = pd.to_datetime(cols['valid_time'], errors='coerce')
+    df = pd.DataFrame(cols, columns=INDEX_COLUMNS, copy=False)
+
+    if convert_imperial and units_only_rows:
+        units = df['units']
+        imperial = units.map(_IMPERIAL_UNITS)
+        is_m = units == 'm'
+        is_accum = df['shortName'].isin(ACCUM_VARS)
+        imperial[is_m & is_accum] = 'in'
+        imperial[is_m & ~is_accum] = 'ft'
+        change = pd.Series(units_only_rows, index=df.index) & imperial.notna()
+        df.loc[change, 'units'] = imperial[change]
+
+    # Non-instant fields (accum/max/min/avg) get their step window appended in one vectorized pass
+    timed = ~df['stepType'].fillna('').isin(['', 'instant'])
+    # A non-instant message no branch describes (e.g. a 'between' probability) was never indexed
+    undescribed = timed & df['full_desc'].isna()
+    if undescribed.any():
+        df = df[~undescribed].reset_index(drop=True)
+        timed = timed[~undescribed].reset_index(drop=True)
+    if timed.any():
+        df.loc[timed, 'full_desc'] = (df.loc[timed, 'full_desc'] + ' [' + df.loc[timed, 'stepRange'].astype(str)
+                                      + ' hr ' + df.loc[timed, 'stepType'] + ']')
+    df['full_desc'] = df['full_desc'].fillna('')
+    return df
+
+def index_many(filenames, workers=None, convert_imperial=True):
+    """Indexes several GRIB2 files in parallel worker processes and concatenates the results in input order."""
+    filenames = list(filenames)
+    if not filenames: return pd.DataFrame(columns=INDEX_COLUMNS)
+    # Files are independent; each worker opens its own ecCodes handles
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        frames = list(executor.map(partial(index_nbm5_grib, convert_imperial=convert_imperial), filenames))
+    return pd.concat(frames, ignore_index=True, copy=False)
 
 # --- SELF-TEST BLOCK ---
 if __name__ == "__main__":